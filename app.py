@@ -1,17 +1,21 @@
 #!/usr/bin/env python3
+import functools
+import io
 import os
 import json
 import queue
 from datetime import datetime
-from pathlib import Path
-from subprocess import run, CalledProcessError
+from zlib import crc32
 from threading import Thread, Lock
-from time import sleep
+from time import sleep, monotonic
 
-from flask import Flask, Response, jsonify, render_template, send_file, abort
+import numpy as np
+from flask import Flask, Response, jsonify, render_template, request, send_file, abort
 from gpiozero import Button
+from picamera2 import Picamera2
 from PIL import Image, ImageDraw, ImageFont
 from st7735 import ST7735
+from turbojpeg import TurboJPEG, TJPF_GRAY, TJSAMP_GRAY
 
 # ================== Config ==================
 USER_HOME    = os.path.expanduser("~")
@@ -24,6 +28,40 @@ AUTOFOCUS    = True                       # set False if your module lacks AF
 
 os.makedirs(PHOTOS_DIR, exist_ok=True)
 
+# orjson is ~3x faster than stdlib json on the Pi; fall back if missing
+try:
+    import orjson
+    def _json_dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+# libjpeg-turbo codec (SIMD/NEON) — much faster than PIL's JPEG path on the Pi
+_tj = TurboJPEG()
+
+# Persistent camera: configure the pipeline once at boot instead of paying
+# process launch + 3A convergence on every shot.
+picam = Picamera2()
+picam.configure(picam.create_still_configuration(
+    main={"size": (CAP_W, CAP_H), "format": "YUV420"}
+))
+if AUTOFOCUS:
+    try:
+        from libcamera import controls
+        picam.set_controls({"AfMode": controls.AfModeEnum.Continuous})
+    except Exception:
+        pass
+picam.start()
+
+# Button thread and Flask threads can both capture
+cam_lock = Lock()
+
+# Reused per-capture scratch buffers — allocate the 1 MB plane and the
+# encode buffer once at boot instead of on every shot
+_gray_buf = np.empty((CAP_H, CAP_W), np.uint8)
+_webp_buf = io.BytesIO()
+
 # ===== LCD params (rotated 90°) =====
 DC_PIN, RST_PIN, BL_PIN = 25, 27, 24
 WIDTH, HEIGHT           = 128, 128
@@ -49,21 +87,75 @@ except Exception:
 
 lcd_lock = Lock()
 
-def lcd_show_text(line1="Ready", line2="Press button / Web"):
-    """Render two centered lines on the LCD."""
+def _to_rgb565(img):
+    """Pack a 128x128 RGB image into big-endian RGB565 bytes with numpy."""
+    arr = np.asarray(img).astype(np.uint16)
+    v = ((arr[..., 0] & 0xF8) << 8) | ((arr[..., 1] & 0xFC) << 3) | (arr[..., 2] >> 3)
+    return v.byteswap().tobytes()
+
+def _lcd_push(img):
+    """Send a full frame in one SPI burst, bypassing the library's
+    per-pixel Python packing. Falls back to disp.display() if the
+    low-level window/data handles aren't available."""
+    try:
+        disp.set_window(0, 0, WIDTH - 1, HEIGHT - 1)
+        disp.data(_to_rgb565(img))
+    except Exception:
+        disp.display(img)
+
+@functools.lru_cache(maxsize=256)
+def _glyph(ch, bold):
+    """Rasterize one character once; reused as a paste mask ever after."""
+    font = FONT_BOLD if bold else FONT
+    w, h = font.getsize(ch)
+    mask = Image.new("L", (max(w, 1), max(h, 1)), 0)
+    ImageDraw.Draw(mask).text((0, 0), ch, font=font, fill=255)
+    return mask, w, h
+
+def _blit_line(img, text, y, bold, fill):
+    """Paste cached glyph masks for 'text', centered horizontally at row y."""
+    widths = [_glyph(c, bold)[1] for c in text]
+    x = (WIDTH - sum(widths)) // 2
+    for c, w in zip(text, widths):
+        img.paste(fill, (x, y), _glyph(c, bold)[0])
+        x += w
+
+@functools.lru_cache(maxsize=16)
+def _render_text_img(line1, line2):
+    """Rasterize a two-line status screen; cached so repeated states
+    ("Ready", "Capturing...") don't re-measure and re-draw the same pixels.
+    Glyphs hit the per-character cache, so no FreeType call per invocation."""
     img = Image.new("RGB", (WIDTH, HEIGHT), (0, 0, 0))
-    d = ImageDraw.Draw(img)
-    w1, h1 = d.textsize(line1, font=FONT_BOLD)
-    w2, h2 = d.textsize(line2, font=FONT)
+    h1 = max((_glyph(c, True)[2] for c in line1), default=0)
+    h2 = max((_glyph(c, False)[2] for c in line2), default=0)
     total_h = h1 + 6 + h2
     y1 = (HEIGHT - total_h) // 2
     y2 = y1 + h1 + 6
-    x1 = (WIDTH - w1) // 2
-    x2 = (WIDTH - w2) // 2
-    d.text((x1, y1), line1, font=FONT_BOLD, fill=(255, 255, 255))
-    d.text((x2, y2), line2, font=FONT, fill=(200, 200, 200))
+    _blit_line(img, line1, y1, True, (255, 255, 255))
+    _blit_line(img, line2, y2, False, (200, 200, 200))
+    return img
+
+_last_lcd = {"key": None, "t": 0.0}
+
+def lcd_show_text(line1="Ready", line2="Press button / Web"):
+    """Render two centered lines on the LCD."""
+    key = (line1, line2)
+    now = monotonic()
+    # Under burst presses the same frame gets requested back to back;
+    # skip the redundant SPI transfer when the pixels can't have changed
+    if _last_lcd["key"] == key and now - _last_lcd["t"] < 0.25:
+        return
+    _last_lcd["key"] = key
+    _last_lcd["t"] = now
+    img = _render_text_img(line1, line2)
     with lcd_lock:
-        disp.display(img)
+        _lcd_push(img)
+
+# Warm the glyph cache for every character the fixed status strings use,
+# so the first press of the day doesn't pay FreeType's cold rasterization
+for _c in set("Ready Press button / Web Capturing... Saved Capture ERR See logs 0123456789:"):
+    _glyph(_c, True)
+    _glyph(_c, False)
 
 lcd_show_text("Ready", "Press button / Web")
 
@@ -71,37 +163,87 @@ lcd_show_text("Ready", "Press button / Web")
 btn = Button(BUTTON_BCM, pull_up=True, bounce_time=0.15)
 
 def _list_images_sorted():
-    p = Path(PHOTOS_DIR)
-    files = [*p.glob("*.jpg"), *p.glob("*.jpeg"), *p.glob("*.png"), *p.glob("*.webp")]
-    files.sort(key=lambda x: x.stat().st_mtime)
-    return files
+    """One os.scandir pass: (name, stat) per image, sorted by mtime.
+
+    DirEntry.stat() comes from the readdir cache, so this is one syscall
+    per entry instead of the ~5 the old glob+stat version paid.
+    """
+    exts = (".jpg", ".jpeg", ".png", ".webp")
+    with os.scandir(PHOTOS_DIR) as it:
+        # latest.* are mutable aliases of the newest capture with their own
+        # no-cache routes; listing them would pin stale copies in browsers
+        ents = [(e.name, e.stat()) for e in it
+                if e.is_file() and e.name.lower().endswith(exts)
+                and not e.name.startswith("latest.")]
+    ents.sort(key=lambda t: t[1].st_mtime)
+    return ents
+
+# Cached /gallery.json payload: rebuilt on capture, not on every request
+_gallery_lock = Lock()
+_gallery_cache = {"etag": None, "body": None}
+
+def _rebuild_gallery_cache():
+    items = [
+        {"name": name, "url": f"/img/{name}", "size": st.st_size,
+         "mtimeMs": int(st.st_mtime * 1000)}
+        for name, st in _list_images_sorted()
+    ]
+    body = _json_dumps({"ok": True, "local": items})
+    with _gallery_lock:
+        _gallery_cache["body"] = body
+        _gallery_cache["etag"] = f'"{crc32(body):08x}"'
+
+_rebuild_gallery_cache()
+
+# One capture at a time: a press (or POST) landing mid-capture collapses
+# into the running one, which already refreshes the LCD, gallery and SSE.
+# A non-blocking Lock makes the test-and-claim atomic — an Event's
+# is_set()/set() pair would let two threads through and both would encode
+# from the shared _gray_buf
+_capture_busy = Lock()
 
 def capture_once():
-    tmp_path = "/tmp/shot.jpg"
+    if not _capture_busy.acquire(blocking=False):
+        return False, "capture already in progress"
+    try:
+        return _capture_impl()
+    finally:
+        _capture_busy.release()
 
+def _capture_impl():
     lcd_show_text("Capturing...", datetime.now().strftime("%H:%M:%S"))
 
-    cmd = [
-        "libcamera-jpeg", "-n",
-        "--width", str(CAP_W), "--height", str(CAP_H),
-        "-o", tmp_path
-    ]
-    if AUTOFOCUS:
-        cmd.extend(["--autofocus-mode", "continuous"])
-
     try:
-        run(cmd, check=True)
-
-        # --- Convert to Black & White (grayscale) ---
-        img = Image.open(tmp_path).convert("L")
+        with cam_lock:
+            yuv = picam.capture_array("main")
+
+            # The Y plane of YUV420 *is* the grayscale image — no JPEG decode,
+            # no RGB->L conversion. Copy it into the reused scratch buffer so
+            # the camera frame can be recycled and nothing is allocated here.
+            np.copyto(_gray_buf, yuv[:CAP_H, :CAP_W])
+        gray = _gray_buf
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         final_jpg = os.path.join(PHOTOS_DIR, f"{ts}.jpg")
 
-        img.save(LATEST_JPG, format="JPEG", quality=90)
-        img.save(final_jpg, format="JPEG", quality=90)
+        # Encode once, write once; latest.jpg is a hardlink to the same inode
+        jpg_bytes = _tj.encode(gray, quality=90, pixel_format=TJPF_GRAY,
+                               jpeg_subsample=TJSAMP_GRAY)
+        with open(final_jpg, "wb") as f:
+            f.write(jpg_bytes)
+        try:
+            os.unlink(LATEST_JPG)
+        except FileNotFoundError:
+            pass
+        os.link(final_jpg, LATEST_JPG)
 
         try:
-            img.save(LATEST_WEBP, format="WEBP", quality=90)
+            # method=6 trades a little encode time for noticeably smaller files
+            _webp_buf.seek(0)
+            _webp_buf.truncate(0)
+            Image.frombuffer("L", (CAP_W, CAP_H), gray, "raw", "L", 0, 1).save(
+                _webp_buf, format="WEBP", quality=90, method=6)
+            with open(LATEST_WEBP, "wb") as f:
+                f.write(_webp_buf.getbuffer())
         except Exception:
             pass
 
@@ -112,7 +254,7 @@ def capture_once():
 
         _broadcast({"type": "captured", "ts": int(datetime.now().timestamp())})
         return True, final_jpg
-    except CalledProcessError as e:
+    except Exception as e:
         lcd_show_text("Capture ERR", "See logs")
         sleep(1.2)
         lcd_show_text("Ready", "Press button / Web")
@@ -127,41 +269,79 @@ def button_worker():
         sleep(0.2)
 
 # =============== SSE (server-sent events) ===============
-_subscribers = []
+_subscribers = set()
+_subs_lock = Lock()
+MAX_SUBSCRIBERS = 64  # cap per-queue memory held for half-open clients
 
 def _broadcast(obj):
-    data = "data: " + json.dumps(obj) + "\n\n"
+    if obj.get("type") == "captured":
+        _rebuild_gallery_cache()
+    data = "data: " + _json_dumps(obj).decode("utf-8") + "\n\n"
+    is_captured = obj.get("type") == "captured"
     dead = []
-    for q in list(_subscribers):
+    with _subs_lock:
+        snap = tuple(_subscribers)
+    for q in snap:
+        # Coalesce: one queued "captured" already forces a refresh
+        if is_captured and getattr(q, "captured_pending", False):
+            continue
         try:
             q.put_nowait(data)
+        except queue.Full:
+            # Slow-but-alive client: drop its oldest event, don't kill it
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                q.put_nowait(data)
+            except queue.Full:
+                dead.append(q)
+                continue
         except Exception:
             dead.append(q)
-    for q in dead:
-        try:
-            _subscribers.remove(q)
-        except ValueError:
-            pass
+            continue
+        if is_captured:
+            q.captured_pending = True
+    if dead:
+        with _subs_lock:
+            _subscribers.difference_update(dead)
 
 def _event_stream():
     q = queue.Queue(maxsize=10)
-    _subscribers.append(q)
-    yield "data: " + json.dumps({"type": "hello", "ts": int(datetime.now().timestamp())}) + "\n\n"
+    q.captured_pending = False
+    with _subs_lock:
+        _subscribers.add(q)
+    yield "data: " + _json_dumps({"type": "hello", "ts": int(datetime.now().timestamp())}).decode("utf-8") + "\n\n"
     try:
         while True:
             try:
                 chunk = q.get(timeout=15)
+                q.captured_pending = False
                 yield chunk
             except queue.Empty:
                 yield ": keep-alive\n\n"
     finally:
-        try:
-            _subscribers.remove(q)
-        except ValueError:
-            pass
+        with _subs_lock:
+            _subscribers.discard(q)
 
 # =============== Web app ====================
 app = Flask(__name__, static_folder="static", template_folder="templates")
+# Behind nginx, let it serve the file bodies (map /photos/ with `internal;`)
+app.config["USE_X_SENDFILE"] = bool(os.environ.get("USE_X_SENDFILE"))
+
+def _send_file_fast(target, mimetype):
+    """Serve a file via the WSGI server's sendfile(2) wrapper when it has one.
+
+    Falls back to Flask's send_file (chunked userspace reads) otherwise.
+    """
+    wrapper = request.environ.get("wsgi.file_wrapper")
+    if wrapper is None or app.config["USE_X_SENDFILE"]:
+        return send_file(target, mimetype=mimetype, as_attachment=False)
+    size = os.path.getsize(target)
+    rv = Response(wrapper(open(target, "rb"), 65536), mimetype=mimetype)
+    rv.headers["Content-Length"] = str(size)
+    return rv
 
 @app.route("/")
 def index():
@@ -169,21 +349,34 @@ def index():
 
 @app.route("/events")
 def events():
+    if len(_subscribers) >= MAX_SUBSCRIBERS:
+        abort(503)
     return Response(_event_stream(), mimetype="text/event-stream")
 
+def _send_latest(target, mimetype):
+    """Serve a mutable file with an mtime+size ETag so unchanged previews 304."""
+    st = os.stat(target)
+    etag = f'"{st.st_mtime_ns}-{st.st_size}"'
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status=304, headers={"ETag": etag})
+    rv = _send_file_fast(target, mimetype)
+    rv.headers["ETag"] = etag
+    rv.headers["Cache-Control"] = "no-cache"  # revalidate, don't re-download
+    return rv
+
 @app.route("/latest.webp")
 def latest_webp():
     target = LATEST_WEBP if os.path.exists(LATEST_WEBP) else LATEST_JPG
     if not os.path.exists(target):
         abort(404)
     mt = "image/webp" if target.endswith(".webp") else "image/jpeg"
-    return send_file(target, mimetype=mt, as_attachment=False)
+    return _send_latest(target, mt)
 
 @app.route("/latest.jpg")
 def latest_jpg():
     if not os.path.exists(LATEST_JPG):
         abort(404)
-    return send_file(LATEST_JPG, mimetype="image/jpeg", as_attachment=False)
+    return _send_latest(LATEST_JPG, "image/jpeg")
 
 @app.route("/img/<path:name>")
 def serve_image(name):
@@ -193,33 +386,40 @@ def serve_image(name):
         abort(404)
     ext = safe.lower().rsplit(".", 1)[-1]
     mt = "image/jpeg" if ext in ("jpg", "jpeg") else ("image/webp" if ext == "webp" else "image/png")
-    return send_file(target, mimetype=mt, as_attachment=False)
+    # latest.* change on every capture — serve them revalidated, not cached
+    if safe.startswith("latest."):
+        return _send_latest(target, mt)
+    rv = _send_file_fast(target, mt)
+    # Timestamped captures never change; let gallery re-renders reuse them
+    rv.headers["Cache-Control"] = "public, max-age=300"
+    return rv
 
 @app.route("/gallery.json")
 def gallery():
-    items = []
-    for f in _list_images_sorted():
-        st = f.stat()
-        items.append({
-            "name": f.name,
-            "url": f"/img/{f.name}",
-            "size": st.st_size,
-        #  @app.route("/img/")
-   "mtimeMs": int(st.st_mtime * 1000),
-        })
-    return jsonify({"ok": True, "local": items})
+    with _gallery_lock:
+        body, etag = _gallery_cache["body"], _gallery_cache["etag"]
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status=304, headers={"ETag": etag})
+    return Response(body, mimetype="application/json", headers={"ETag": etag})
 
 @app.route("/capture", methods=["POST"])
 def capture():
     ok, info = capture_once()
     if ok:
-        url = "/latest.webp?ts=" + str(int(datetime.now().timestamp()))
-        return jsonify({"ok": True, "url": url})
+        return jsonify({"ok": True, "url": "/latest.webp"})
     return jsonify({"ok": False, "error": info}), 500
 
 def main():
     Thread(target=button_worker, daemon=True).start()
-    app.run(host="0.0.0.0", port=5000, debug=False)
+    try:
+        # Threaded WSGI server with HTTP/1.1 keepalive so the burst of
+        # thumbnail requests reuses connections instead of handshaking each
+        from waitress import serve as waitress_serve
+        waitress_serve(app, host="0.0.0.0", port=5000,
+                       threads=8, connection_limit=200, channel_timeout=60)
+    except Exception:
+        # Fallback to Flask's built-in server
+        app.run(host="0.0.0.0", port=5000, debug=False)
 
 if __name__ == "__main__":
     main()
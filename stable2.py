@@ -8,13 +8,15 @@ import queue
 from datetime import datetime
 from pathlib import Path
 from subprocess import run, CalledProcessError
-from threading import Thread, Lock
+from threading import Thread, Lock, Timer
 from time import sleep
 
-from flask import Flask, Response, jsonify, send_file, abort, render_template_string
+import numpy as np
+from flask import Flask, Response, jsonify, send_file, abort, render_template_string, request
 from gpiozero import Button
 from PIL import Image, ImageDraw, ImageFont
 from st7735 import ST7735
+from turbojpeg import TurboJPEG, TJPF_GRAY, TJSAMP_GRAY
 
 # ================== Config ==================
 USER_HOME    = os.path.expanduser("~")
@@ -28,6 +30,9 @@ PORT         = int(os.environ.get("PORT", "5050"))  # default to 5050 to avoid c
 
 os.makedirs(PHOTOS_DIR, exist_ok=True)
 
+# libjpeg-turbo codec (SIMD/NEON) — much faster than PIL's JPEG path on the Pi
+_tj = TurboJPEG()
+
 # ===== LCD params (rotated 90°) =====
 DC_PIN, RST_PIN, BL_PIN = 25, 27, 24
 WIDTH, HEIGHT           = 128, 128
@@ -69,17 +74,41 @@ def lcd_show_text(line1="Ready", line2="Press button / Web"):
     with lcd_lock:
         disp.display(img)
 
+# Pending revert-to-Ready timer; a new preview cancels the previous one
+_revert_timer = None
+
+def _schedule_ready_revert(seconds):
+    """Flip the LCD back to the Ready screen after 'seconds' without blocking."""
+    global _revert_timer
+    if _revert_timer is not None:
+        _revert_timer.cancel()
+    _revert_timer = Timer(seconds, lcd_show_text, ("Ready", "Press button / Web"))
+    _revert_timer.daemon = True
+    _revert_timer.start()
+
 def lcd_show_preview(pil_img, seconds=3.0):
     """
     Show a scaled, centered preview of pil_img on the LCD for 'seconds'.
     Keeps aspect ratio; letterboxes to 128x128 on black.
+    The revert to Ready runs on a timer so the caller isn't held for 'seconds'.
     """
-    # Ensure RGB for the LCD
-    im = pil_img.convert("RGB")
-    # Create a copy to safely resize
-    im = im.copy()
-    # Fit within WIDTH x HEIGHT while preserving aspect ratio
-    im.thumbnail((WIDTH, HEIGHT), Image.LANCZOS)
+    # Downscale the single-channel image first (128x128 = 16 KB), then convert
+    # to RGB; converting 1024x1024 L->RGB up front triples the memory traffic
+    # just to throw most of it away in the resize.
+    arr = np.asarray(pil_img if pil_img.mode == "L" else pil_img.convert("L"))
+    h, w = arr.shape
+    # Fit within WIDTH x HEIGHT while preserving aspect ratio (shrink only)
+    scale = min(WIDTH / w, HEIGHT / h, 1.0)
+    new_w, new_h = max(1, int(w * scale)), max(1, int(h * scale))
+    if w % new_w == 0 and h % new_h == 0:
+        # Exact integer ratio (1024 -> 128 is 8x): box average via reshape+mean.
+        # LANCZOS is overkill for a 128 px panel and much slower on the Pi.
+        fx, fy = w // new_w, h // new_h
+        small = arr.reshape(new_h, fy, new_w, fx).mean(axis=(1, 3)).astype(np.uint8)
+    else:
+        # Non-integer ratio: PIL's BOX filter is the area-average fallback
+        small = np.asarray(Image.fromarray(arr, "L").resize((new_w, new_h), Image.BOX))
+    im = Image.fromarray(np.stack([small] * 3, axis=-1), "RGB")
     # Center on a black canvas
     canvas = Image.new("RGB", (WIDTH, HEIGHT), (0, 0, 0))
     x = (WIDTH - im.width) // 2
@@ -87,7 +116,7 @@ def lcd_show_preview(pil_img, seconds=3.0):
     canvas.paste(im, (x, y))
     with lcd_lock:
         disp.display(canvas)
-    sleep(seconds)
+    _schedule_ready_revert(seconds)
 
 lcd_show_text("Ready", "Press button / Web")
 
@@ -116,14 +145,25 @@ def capture_once():
     try:
         run(cmd, check=True)
 
-        # --- Convert to Black & White (grayscale) ---
-        img = Image.open(tmp_path).convert("L")
+        # --- Convert to Black & White (grayscale) via libjpeg-turbo ---
+        with open(tmp_path, "rb") as f:
+            gray = _tj.decode(f.read(), pixel_format=TJPF_GRAY)
+        if gray.ndim == 3:
+            gray = gray[:, :, 0]
+        img = Image.fromarray(gray, "L")
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         final_jpg = os.path.join(PHOTOS_DIR, f"{ts}.jpg")
 
-        # Save latest + timestamped
-        img.save(LATEST_JPG, format="JPEG", quality=90)
-        img.save(final_jpg, format="JPEG", quality=90)
+        # Encode once, write once; latest.jpg is a hardlink to the same inode
+        jpg_bytes = _tj.encode(gray, quality=90, pixel_format=TJPF_GRAY,
+                               jpeg_subsample=TJSAMP_GRAY)
+        with open(final_jpg, "wb") as f:
+            f.write(jpg_bytes)
+        try:
+            os.unlink(LATEST_JPG)
+        except FileNotFoundError:
+            pass
+        os.link(final_jpg, LATEST_JPG)
 
         # Optional WEBP for faster preview (fallback to JPG if fails)
         try:
@@ -131,12 +171,9 @@ def capture_once():
         except Exception:
             pass
 
-        # ---- NEW: 3s preview on LCD (scaled fit) ----
+        # ---- 3s preview on LCD (scaled fit, reverts via timer) ----
         lcd_show_preview(img, seconds=3.0)
-        # ---------------------------------------------
-
-        # Back to Ready
-        lcd_show_text("Ready", "Press button / Web")
+        # -----------------------------------------------------------
         print(f"Captured {final_jpg}")
 
         _broadcast({"type": "captured", "ts": int(datetime.now().timestamp())})
@@ -191,6 +228,21 @@ def _event_stream():
 
 # =============== Web app (inline HTML/CSS/JS) ====================
 app = Flask(__name__)
+# Behind nginx, let it serve the file bodies (map /photos/ with `internal;`)
+app.config["USE_X_SENDFILE"] = bool(os.environ.get("USE_X_SENDFILE"))
+
+def _send_file_fast(target, mimetype):
+    """Serve a file via the WSGI server's sendfile(2) wrapper when it has one.
+
+    Falls back to Flask's send_file (chunked userspace reads) otherwise.
+    """
+    wrapper = request.environ.get("wsgi.file_wrapper")
+    if wrapper is None or app.config["USE_X_SENDFILE"]:
+        return send_file(target, mimetype=mimetype, as_attachment=False)
+    size = os.path.getsize(target)
+    rv = Response(wrapper(open(target, "rb"), 65536), mimetype=mimetype)
+    rv.headers["Content-Length"] = str(size)
+    return rv
 
 INDEX_HTML = """<!doctype html>
 <html>
@@ -347,13 +399,13 @@ def latest_webp():
     if not os.path.exists(target):
         abort(404)
     mt = "image/webp" if target.endswith(".webp") else "image/jpeg"
-    return send_file(target, mimetype=mt, as_attachment=False)
+    return _send_file_fast(target, mt)
 
 @app.route("/latest.jpg")
 def latest_jpg():
     if not os.path.exists(LATEST_JPG):
         abort(404)
-    return send_file(LATEST_JPG, mimetype="image/jpeg", as_attachment=False)
+    return _send_file_fast(LATEST_JPG, "image/jpeg")
 
 @app.route("/img/<path:name>")
 def serve_image(name):
@@ -363,7 +415,7 @@ def serve_image(name):
         abort(404)
     ext = safe.lower().rsplit(".", 1)[-1]
     mt = "image/jpeg" if ext in ("jpg", "jpeg") else ("image/webp" if ext == "webp" else "image/png")
-    return send_file(target, mimetype=mt, as_attachment=False)
+    return _send_file_fast(target, mt)
 
 @app.route("/gallery.json")
 def gallery():
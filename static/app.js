@@ -4,6 +4,12 @@ const img = document.getElementById("preview");
 const gridLocal = document.getElementById("gridLocal");
 const countLocal = document.getElementById("countLocal");
 
+function refreshPreview(){
+  // No cache-buster: the server's ETag turns unchanged fetches into 304s.
+  img.removeAttribute("src");
+  img.src = "/latest.webp";
+}
+
 async function capture() {
   btn.disabled = true;
   btn.textContent = "Capturing…";
@@ -12,7 +18,7 @@ async function capture() {
     const r = await fetch("/capture", { method: "POST" });
     const data = await r.json();
     if (!data.ok) throw new Error(data.error || "Unknown error");
-    img.src = data.url;
+    refreshPreview();
     statusEl.textContent = "Done.";
     await refreshGallery();
   } catch (e) {
@@ -32,7 +38,7 @@ try {
     try {
       const msg = JSON.parse(ev.data);
       if (msg.type === "captured") {
-        img.src = "/latest.webp?ts=" + msg.ts;
+        refreshPreview();
         await refreshGallery();
       }
     } catch {}
@@ -76,6 +82,6 @@ async function refreshGallery(){
 }
 
 (async function init(){
-  img.src = "/latest.webp?ts=" + Date.now();
+  refreshPreview();
   await refreshGallery();
 })();
@@ -3,19 +3,26 @@
 # LCD rotated 90°, 3s on-LCD preview (scaled), gallery, SSE updates.
 
 import os
+import functools
+import hashlib
 import io
 import json
 import math
 import queue
+from collections import deque
 from datetime import datetime
+from types import SimpleNamespace
 from pathlib import Path
-from subprocess import run, CalledProcessError
-from threading import Thread, Lock
+from subprocess import run, CalledProcessError, Popen
+from threading import Thread, Lock, Timer
 from time import sleep, time
 
-from flask import Flask, Response, jsonify, send_file, abort, render_template_string, request
+import numpy as np
+from flask import Flask, Response, jsonify, send_file, send_from_directory, abort, request
 from subprocess import PIPE
 from gpiozero import Button
+from picamera2 import Picamera2
+import PIL
 from PIL import Image, ImageDraw, ImageFont
 from st7735 import ST7735
 
@@ -32,7 +39,8 @@ BUTTON_BCM     = 13                  # joystick press pin
 AUTOFOCUS      = False               # set True only if you need AF and your module supports it
 
 PORT           = int(os.environ.get("PORT", "5050"))
-ARWEAVE_JSON   = os.path.join(PHOTOS_DIR, "arweave.json")
+ARWEAVE_JSON   = os.path.join(PHOTOS_DIR, "arweave.json")   # legacy array format
+ARWEAVE_JSONL  = os.path.join(PHOTOS_DIR, "arweave.jsonl")  # append-only, one record per line
 MAX_BYTES      = 100 * 1024          # 100 KB hard cap per saved image
 
 # WebP encoder tuning (lighter for speed)
@@ -41,11 +49,50 @@ MIN_SIDE_PX    = 640                 # do not shrink below this shorter side
 WEBP_METHOD    = 4                   # 0-6; 4 is much faster than 6 with small quality tradeoff
 MAX_DOWNSCALE_STEPS = 5              # cap attempts
 
-# RAM tmp to avoid SD I/O latency
-TMP_PATH       = "/dev/shm/shot.jpg"
-
 os.makedirs(PHOTOS_DIR, exist_ok=True)
 
+# orjson is ~3x faster than stdlib json on the Pi; fall back if missing.
+# _json_dumps returns str so SSE chunks and jsonl lines stay text.
+try:
+    import orjson
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode("utf-8")
+    def _json_loads(s):
+        return orjson.loads(s)
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False)
+    def _json_loads(s):
+        return json.loads(s)
+
+# The resize/encode hot path expects the Pillow-SIMD fork (NEON kernels on
+# the Pi: `pip uninstall pillow && pip install pillow-simd`). Its versions
+# carry a .postN suffix; warn loudly if stock scalar Pillow got installed.
+if "post" not in PIL.__version__:
+    print(f"WARNING: stock Pillow {PIL.__version__} loaded — "
+          "install pillow-simd for the SIMD resize/encode path")
+
+# Persistent camera: configure the YUV pipeline once at boot; a shot is then
+# just a frame grab — no process spawn, no JPEG encode/decode round-trip.
+# buffer_count=4 keeps the queue deep enough that the ISP never stalls
+# waiting for us to return a buffer. The sensor streams continuously (never
+# stopped) — costs a bit of power, but AE/AWB stay converged so the first
+# frame after a press is already well-exposed.
+picam2 = Picamera2()
+picam2.configure(picam2.create_still_configuration(
+    main={"size": (CAP_W, CAP_H), "format": "YUV420"}, buffer_count=4
+))
+if AUTOFOCUS:
+    try:
+        from libcamera import controls
+        picam2.set_controls({"AfMode": controls.AfModeEnum.Continuous})
+    except Exception:
+        pass
+picam2.start()
+
+# Button thread and Flask threads can both capture
+cam_lock = Lock()
+
 # ===== LCD params (rotated 90°) =====
 DC_PIN, RST_PIN, BL_PIN = 25, 27, 24
 WIDTH, HEIGHT           = 128, 128
@@ -87,113 +134,249 @@ def _schedule_upload_window_reset(expected_deadline, window_id):
             lcd_show_text("Ready", "Press button / Web")
     Thread(target=worker, daemon=True).start()
 
+# Fixed 128x128 panel: one framebuffer allocated at boot, plus per-string
+# sprites rendered once — no Image/Draw churn on every status change
+_lcd_buf = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+
+def _to_rgb565(arr):
+    """Pack an HxWx3 uint8 frame into big-endian RGB565 bytes for the panel."""
+    a = arr.astype(np.uint16)
+    v = ((a[..., 0] & 0xF8) << 8) | ((a[..., 1] & 0xFC) << 3) | (a[..., 2] >> 3)
+    return v.byteswap().tobytes()
+
+def _lcd_push(arr):
+    """Send a full frame as one packed SPI burst (no per-frame PIL convert).
+
+    Falls back to the driver's own display() if the low-level window/data
+    API isn't exposed by this st7735 build.
+    """
+    try:
+        disp.set_window(0, 0, WIDTH - 1, HEIGHT - 1)
+        disp.data(_to_rgb565(arr))
+    except Exception:
+        disp.display(Image.fromarray(arr))
+
+# Bounded: capture_once feeds the current HH:MM:SS through here, so an
+# unbounded dict would leak one sprite per capture forever
+@functools.lru_cache(maxsize=256)
+def _sprite(text, font, color):
+    """Render one status string to an RGB sprite, reused while cached."""
+    w, h = font.getsize(text)
+    img = Image.new("RGB", (max(w, 1), max(h, 1)), (0, 0, 0))
+    ImageDraw.Draw(img).text((0, 0), text, font=font, fill=color)
+    return np.asarray(img)
+
+def _blit_centered(spr, y):
+    """memcpy a sprite into the framebuffer, centered and clipped to 128 px."""
+    h, w = spr.shape[:2]
+    if w > WIDTH:
+        spr = spr[:, :WIDTH]
+        w = WIDTH
+    h = min(h, HEIGHT - y)
+    if h <= 0:
+        return
+    x = (WIDTH - w) // 2
+    _lcd_buf[y:y + h, x:x + w] = spr[:h]
+
+def _offer_upload_window():
+    """Arm the 5 s press-to-upload window (runs after the preview timer)."""
+    global _upload_prompt_deadline, _upload_window_id
+    lcd_show_text("Upload to Arweave?", "Press within 5s")
+    _upload_prompt_deadline = time() + 5.0
+    # schedule automatic reset back to Ready if no press within window
+    _upload_window_id += 1
+    _schedule_upload_window_reset(_upload_prompt_deadline, _upload_window_id)
+
 def lcd_show_text(line1="Ready", line2="Press button / Web"):
     """Render two centered lines on the LCD."""
-    img = Image.new("RGB", (WIDTH, HEIGHT), (0, 0, 0))
-    d = ImageDraw.Draw(img)
-    w1, h1 = d.textsize(line1, font=FONT_BOLD)
-    w2, h2 = d.textsize(line2, font=FONT)
+    s1 = _sprite(line1, FONT_BOLD, (255, 255, 255))
+    s2 = _sprite(line2, FONT, (200, 200, 200))
+    h1, h2 = s1.shape[0], s2.shape[0]
     total_h = h1 + 6 + h2
-    y1 = (HEIGHT - total_h) // 2
+    y1 = max(0, (HEIGHT - total_h) // 2)
     y2 = y1 + h1 + 6
-    x1 = (WIDTH - w1) // 2
-    x2 = (WIDTH - w2) // 2
-    d.text((x1, y1), line1, font=FONT_BOLD, fill=(255, 255, 255))
-    d.text((x2, y2), line2, font=FONT, fill=(200, 200, 200))
     with lcd_lock:
-        disp.display(img)
+        _lcd_buf.fill(0)
+        _blit_centered(s1, y1)
+        _blit_centered(s2, y2)
+        _lcd_push(_lcd_buf)
 
-def lcd_show_preview(pil_img, seconds=3.0):
-    """Scaled, centered preview on LCD (use BILINEAR for speed)."""
-    im = pil_img.convert("RGB").copy()
-    im.thumbnail((WIDTH, HEIGHT), Image.BILINEAR)
+# Pending end-of-preview timer; a new preview cancels the previous one
+_preview_timer = None
+
+def lcd_show_preview(pil_img, seconds=3.0, then=None):
+    """Scaled, centered preview on LCD (use BILINEAR for speed).
+
+    Non-blocking: the frame is pushed once and 'then' (default: revert to
+    the Ready screen) runs on a timer after 'seconds', so the capture
+    thread isn't serialized behind the preview window.
+    """
+    w, h = pil_img.size
+    scale = min(WIDTH / w, HEIGHT / h, 1.0)
+    new_w, new_h = max(1, int(w * scale)), max(1, int(h * scale))
+    if pil_img.mode == "L":
+        im = _fast_resize_L(pil_img, new_w, new_h).convert("RGB")
+    else:
+        im = pil_img.convert("RGB").resize((new_w, new_h), Image.BILINEAR)
     canvas = Image.new("RGB", (WIDTH, HEIGHT), (0, 0, 0))
     x = (WIDTH - im.width) // 2
     y = (HEIGHT - im.height) // 2
     canvas.paste(im, (x, y))
     with lcd_lock:
-        disp.display(canvas)
-    sleep(seconds)
+        _lcd_push(np.asarray(canvas))
+    global _preview_timer
+    if _preview_timer is not None:
+        _preview_timer.cancel()
+    if then is None:
+        then = lambda: lcd_show_text("Ready", "Press button / Web")
+    _preview_timer = Timer(seconds, then)
+    _preview_timer.daemon = True
+    _preview_timer.start()
 
 lcd_show_text("Ready", "Press button / Web")
 
+# =============== Fast U8 resize ===============
+# cykooz.resizer (fast_image_resize) has tuned NEON/AVX2 kernels for single-
+# channel U8 planes — exactly our grayscale captures. Optional; fall back to
+# Pillow(-SIMD) when the wheel isn't installed.
+try:
+    from cykooz.resizer import FilterType, ImageData, PixelType, ResizeAlg, Resizer
+    _resizer = Resizer(ResizeAlg.convolution(FilterType.Bilinear))
+    _box_resizer = Resizer(ResizeAlg.convolution(FilterType.Box))
+except ImportError:
+    _resizer = None
+    _box_resizer = None
+
+def _fast_resize_u8(arr, w, h):
+    """Bilinear-resize a uint8 HxW plane, via cykooz.resizer when available."""
+    if _resizer is None:
+        small = Image.fromarray(arr, "L").resize((w, h), Image.BILINEAR)
+        return np.asarray(small)
+    src = ImageData(arr.shape[1], arr.shape[0], PixelType.U8,
+                    bytearray(arr.tobytes()))
+    dst = ImageData(w, h, PixelType.U8)
+    _resizer.resize(src, dst)
+    return np.frombuffer(bytes(dst.get_buffer()), np.uint8).reshape(h, w)
+
+def _fast_downscale_u8(arr, w, h):
+    """Area-average (box) downscale of a uint8 plane — at the snapped
+    fractions the kernel taps align with the pixel grid, so it's both
+    faster and cleaner than bilinear for shrinking."""
+    if _box_resizer is None:
+        small = Image.fromarray(arr, "L").resize((w, h), Image.BOX)
+        return np.asarray(small)
+    src = ImageData(arr.shape[1], arr.shape[0], PixelType.U8,
+                    bytearray(arr.tobytes()))
+    dst = ImageData(w, h, PixelType.U8)
+    _box_resizer.resize(src, dst)
+    return np.frombuffer(bytes(dst.get_buffer()), np.uint8).reshape(h, w)
+
+def _fast_resize_L(pil_img, w, h):
+    """Bilinear-resize an L-mode image (PIL wrapper around the plane resize)."""
+    return Image.fromarray(_fast_resize_u8(np.asarray(pil_img), w, h), "L")
+
+def _img_from_plane(arr):
+    """Zero-copy PIL view of a contiguous uint8 plane, for encode/preview only."""
+    h, w = arr.shape
+    return Image.frombuffer("L", (w, h), arr, "raw", "L", 0, 1)
+
 # =============== WebP (<=100 KB) encoder helpers ===============
 _last_good_q = 78  # heuristic starting point; updated after each success
 
-def _encode_webp(img, quality):
-    """Encode PIL image to WebP bytes with given quality."""
+# Shrink steps snap to these so the box kernel sees exact block ratios
+_DOWNSCALE_FRACTIONS = (1 / 2, 2 / 3, 3 / 4, 7 / 8)
+
+def _encode_webp(arr, quality):
+    """Encode a uint8 grayscale plane to WebP bytes with given quality."""
     buf = io.BytesIO()
-    img.save(buf, format="WEBP", quality=int(quality), method=WEBP_METHOD)
+    _img_from_plane(arr).save(buf, format="WEBP", quality=int(quality), method=WEBP_METHOD)
     return buf.getvalue()
 
-def _quality_search_under_cap(img, max_bytes, q_min=Q_MIN, q_max=Q_MAX, start_q=None, max_steps=5):
+def _quality_search_under_cap(arr, max_bytes, q_min=Q_MIN, q_max=Q_MAX, start_q=None, max_steps=5):
     """
-    Binary/stepped search for a quality <= max_bytes.
-    Uses a biased start near last known good to cut attempts. Caps steps.
+    Jump to a quality <= max_bytes by modeling file size.
+    WebP size is close to log-linear in quality for a fixed image, so two
+    probe encodes solve log(size) ~= a*q + b and the target q follows
+    directly — typically 2 encodes total instead of a 5-step binary search.
     Returns (bytes, quality, fits_under_cap_bool).
     """
     if start_q is None:
         start_q = max(q_min, min(q_max, _last_good_q))
 
-    # Quick try at start_q
-    data = _encode_webp(img, start_q)
+    # Quick try at the remembered quality; doubles as the upper probe
+    data = _encode_webp(arr, start_q)
     if len(data) <= max_bytes:
         return data, start_q, True
 
-    # Boundaries for search
-    lo, hi = q_min, q_max
-    # If start_q too large, move hi left
-    if len(data) > max_bytes:
-        hi = start_q - 1
-
-    best_bytes, best_q = None, None
-    steps = 0
-    while lo <= hi and steps < max_steps:
-        mid = (lo + hi) // 2
-        data = _encode_webp(img, mid)
+    q2, s2 = start_q, len(data)
+    q1 = max(q_min, start_q - 25)
+    data = _encode_webp(arr, q1)
+    s1 = len(data)
+    best = None  # best fitting (data, q) seen — never discard a good encode
+    if s1 <= max_bytes:
+        if q1 == q2 or s1 >= s2:
+            return data, q1, True  # model degenerate but the low probe fits
+        best = (data, q1)  # fits; the model may still find a higher q
+
+    # Solve log(size) ~= a*q + b and aim slightly under the cap
+    if q1 < q2 and 0 < s1 < s2:
+        a = (math.log(s2) - math.log(s1)) / (q2 - q1)
+        b = math.log(s1) - a * q1
+        q = int((math.log(max_bytes * 0.97) - b) / a) if a > 0 else q_min
+    else:
+        q = q_min
+    q = max(q_min, min(q_max, q))
+
+    # At most a couple of corrective encodes below the modeled target
+    for _ in range(max_steps):
+        data = _encode_webp(arr, q)
         if len(data) <= max_bytes:
-            best_bytes, best_q = data, mid
-            lo = mid + 1
-        else:
-            hi = mid - 1
-        steps += 1
-
-    if best_bytes is not None:
-        return best_bytes, best_q, True
-
-    # Nothing fit within steps → try the floor as a fallback result
-    data = _encode_webp(img, q_min)
-    return data, q_min, False
-
-def _downscale_to_limit(img, max_bytes, min_side=MIN_SIDE_PX):
+            return data, q, True
+        if q <= q_min:
+            break
+        q = max(q_min, q - 4)
+
+    # Corrective steps missed, but the q1 probe may already fit: return it
+    # rather than reporting failure and forcing a needless downscale
+    if best is not None:
+        return best[0], best[1], True
+    return data, q, False
+
+def _downscale_to_limit(arr, max_bytes, min_side=MIN_SIDE_PX):
     """
     Try a quick quality search; if not under cap, progressively downscale + retry.
-    Uses BILINEAR for speed.
+    Works on the raw uint8 Y plane end to end — a PIL image only exists
+    transiently inside the encoder, never between downscale steps.
+
+    Note: Pillow's WebP save() has no size-budget knob (it silently drops
+    unknown kwargs like target_size), so the cap is enforced by the quality
+    model in _quality_search_under_cap rather than libwebp's rate control.
     """
     global _last_good_q
 
-    work = img
+    work = arr
     for step in range(MAX_DOWNSCALE_STEPS):
         data, q, ok = _quality_search_under_cap(work, max_bytes, start_q=_last_good_q)
         if ok:
             _last_good_q = q  # remember for next capture
             return work, data, q
 
-        # Still too big at low quality → shrink
-        w, h = work.size
+        # Still too big at low quality → shrink. Snap the step to a simple
+        # fraction nearest sqrt(target/current); the box kernel then averages
+        # whole pixel blocks instead of interpolating at an arbitrary ratio.
+        h, w = work.shape
         if min(w, h) <= min_side:
-            # Force an extra 0.85 step if still too large
-            scale = 0.85
+            scale = 7 / 8  # already at the floor: take the gentlest step
         else:
-            # Heuristic: scale by sqrt(target/current)
             ratio = max_bytes / max(len(data), 1)
-            scale = max(0.70, min(0.92, math.sqrt(ratio)))
-        new_w = max(min_side, int(w * scale))
-        new_h = max(min_side, int(h * scale))
+            want = math.sqrt(ratio)
+            scale = min(_DOWNSCALE_FRACTIONS, key=lambda f: abs(f - want))
+        new_w = max(min_side, round(w * scale))
+        new_h = max(min_side, round(h * scale))
         if new_w >= w and new_h >= h:
-            new_w = max(min_side, int(w * 0.9))
-            new_h = max(min_side, int(h * 0.9))
-        work = work.resize((new_w, new_h), Image.BILINEAR)
+            new_w = max(min_side, round(w * 7 / 8))
+            new_h = max(min_side, round(h * 7 / 8))
+        work = _fast_downscale_u8(work, new_w, new_h)
 
     # Final attempt after steps exhausted
     data, q, ok = _quality_search_under_cap(work, max_bytes, start_q=_last_good_q)
@@ -203,58 +386,69 @@ def _downscale_to_limit(img, max_bytes, min_side=MIN_SIDE_PX):
 # =============== Capture logic ===============
 btn = Button(BUTTON_BCM, pull_up=True, bounce_time=0.15)
 
+THUMB_WIDTH = 192  # gallery grid tile; q=60/method=4 keeps these a few KB
+
 def _list_webps_sorted():
     p = Path(PHOTOS_DIR)
-    files = list(p.glob("*.webp"))
+    files = [f for f in p.glob("*.webp") if not f.name.endswith(".thumb.webp")]
     files.sort(key=lambda x: x.stat().st_mtime)
     return files
 
+def _write_thumb(final_arr, ts):
+    """Save a small companion {ts}.thumb.webp for the gallery grid."""
+    try:
+        h, w = final_arr.shape
+        tw = min(THUMB_WIDTH, w)
+        th = max(1, round(h * tw / w))
+        thumb = _fast_resize_u8(final_arr, tw, th)
+        _img_from_plane(thumb).save(os.path.join(PHOTOS_DIR, f"{ts}.thumb.webp"),
+                                    format="WEBP", quality=60, method=4)
+    except Exception as e:
+        print("Thumbnail write failed:", e)
+
 def capture_once():
     lcd_show_text("Capturing...", datetime.now().strftime("%H:%M:%S"))
 
-    cmd = [
-        "libcamera-jpeg", "-n",
-        "--width", str(CAP_W), "--height", str(CAP_H),
-        "-o", TMP_PATH
-    ]
-    if AUTOFOCUS:
-        cmd.extend(["--autofocus-mode", "continuous"])
-
     try:
-        run(cmd, check=True)
+        with cam_lock:
+            # The deep buffer queue may hold frames from before the press;
+            # sync on fresh metadata so the grab below is current, not stale
+            picam2.capture_metadata()
+            yuv = picam2.capture_array("main")
 
-        # Convert to grayscale from RAM tmp
-        base_img = Image.open(TMP_PATH).convert("L")
+        # The Y plane of YUV420 is already the grayscale image; skip U/V.
+        # Stay in numpy from here — PIL only appears at encode/preview time.
+        base = np.ascontiguousarray(yuv[:CAP_H, :CAP_W])
 
         # Enforce 100 KB cap with faster WebP path
-        final_img, webp_bytes, used_q = _downscale_to_limit(base_img, MAX_BYTES, min_side=MIN_SIDE_PX)
+        final_arr, webp_bytes, used_q = _downscale_to_limit(base, MAX_BYTES, min_side=MIN_SIDE_PX)
 
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         ts_path = os.path.join(PHOTOS_DIR, f"{ts}.webp")
 
-        # Write timestamped + latest (same bytes, two writes but tiny)
-        with open(ts_path, "wb") as f:
-            f.write(webp_bytes)
-        with open(LATEST_WEBP, "wb") as f:
+        # Write the payload once; timestamped copy is a hardlink and
+        # latest.webp an atomic rename — inode ops, no second block write
+        tmp_path = os.path.join(PHOTOS_DIR, f".{ts}.webp.tmp")
+        with open(tmp_path, "wb") as f:
             f.write(webp_bytes)
-
-        # 3s LCD preview of the actual stored image
-        lcd_show_preview(final_img, seconds=3.0)
-
-        # Offer upload via LCD button for 5 seconds
-        global _upload_prompt_deadline
-        lcd_show_text("Upload to Arweave?", "Press within 5s")
-        _upload_prompt_deadline = time() + 5.0
-        # schedule automatic reset back to Ready if no press within window
-        global _upload_window_id
-        _upload_window_id += 1
-        this_id = _upload_window_id
-        _schedule_upload_window_reset(_upload_prompt_deadline, this_id)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.link(tmp_path, ts_path)
+        except FileExistsError:
+            os.unlink(ts_path)
+            os.link(tmp_path, ts_path)
+        os.replace(tmp_path, LATEST_WEBP)
+        _write_thumb(final_arr, ts)
+
+        # 3s LCD preview of the actual stored image, then the upload prompt;
+        # neither blocks the capture thread anymore
+        lcd_show_preview(_img_from_plane(final_arr), seconds=3.0, then=_offer_upload_window)
         print(f"Captured {ts_path}  (q≈{used_q}, bytes={len(webp_bytes)})")
 
         _broadcast({"type": "captured", "ts": int(datetime.now().timestamp())})
         return True, ts_path
-    except CalledProcessError as e:
+    except Exception as e:
         lcd_show_text("Capture ERR", "See logs")
         sleep(1.0)
         lcd_show_text("Ready", "Press button / Web")
@@ -285,37 +479,52 @@ def button_worker():
 
 
 # =============== SSE (server-sent events) ===============
-_subscribers = []
+# Subscribers live in a deque and are only flagged dead (alive=False) on a
+# full queue or disconnect; _broadcast never does an O(N) list.remove. Dead
+# entries are swept lazily from the left where they age out first.
+_subscribers = deque()
+_subs_lock = Lock()
+
+def _sweep_dead_subscribers():
+    with _subs_lock:
+        while _subscribers and not _subscribers[0].alive:
+            _subscribers.popleft()
+
+# Capture/button threads never serialize or fan out themselves: _broadcast
+# is one unbounded put, and the broadcaster thread does the rest
+_bq = queue.Queue()
+
 def _broadcast(obj):
-    data = "data: " + json.dumps(obj) + "\n\n"
-    dead = []
-    for q in list(_subscribers):
-        try:
-            q.put_nowait(data)
-        except Exception:
-            dead.append(q)
-    for q in dead:
-        try:
-            _subscribers.remove(q)
-        except ValueError:
-            pass
+    _bq.put_nowait(obj)
+
+def _broadcaster():
+    while True:
+        obj = _bq.get()
+        data = "data: " + _json_dumps(obj) + "\n\n"
+        for sub in list(_subscribers):
+            if not sub.alive:
+                continue
+            try:
+                sub.q.put_nowait(data)
+            except queue.Full:
+                sub.alive = False  # slow consumer: stop feeding it
+        _sweep_dead_subscribers()
 
 def _event_stream():
-    q = queue.Queue(maxsize=10)
-    _subscribers.append(q)
-    yield "data: " + json.dumps({"type": "hello", "ts": int(datetime.now().timestamp())}) + "\n\n"
+    sub = SimpleNamespace(q=queue.Queue(maxsize=10), alive=True)
+    with _subs_lock:
+        _subscribers.append(sub)
+    yield "data: " + _json_dumps({"type": "hello", "ts": int(datetime.now().timestamp())}) + "\n\n"
     try:
-        while True:
+        while sub.alive:
             try:
-                chunk = q.get(timeout=15)
+                chunk = sub.q.get(timeout=15)
                 yield chunk
             except queue.Empty:
                 yield ": keep-alive\n\n"
     finally:
-        try:
-            _subscribers.remove(q)
-        except ValueError:
-            pass
+        sub.alive = False
+        _sweep_dead_subscribers()
 
 # =============== Web app (inline HTML/CSS/JS) ====================
 app = Flask(__name__)
@@ -442,7 +651,7 @@ function renderLocal(items){
     card.className = "card";
     card.innerHTML = `
       <a href="${it.url}" target="_blank" rel="noopener">
-        <img class="thumb" loading="lazy" src="${it.url}" alt="${it.name}" />
+        <img class="thumb" loading="lazy" src="${it.thumbUrl || it.url}" alt="${it.name}" />
       </a>
       <div class="meta">${dt.toLocaleString()} · ${fmtBytes(it.size)}</div>
     `;
@@ -548,9 +757,18 @@ async function uploadAllToArweave(){
 </html>
 """
 
+# The page is static — encode it once and let browsers revalidate with an
+# ETag instead of re-rendering the template on every hit
+_INDEX_BYTES = INDEX_HTML.encode("utf-8")
+_INDEX_ETAG = hashlib.sha1(_INDEX_BYTES).hexdigest()
+
 @app.route("/")
 def index():
-    return render_template_string(INDEX_HTML)
+    if request.headers.get("If-None-Match") == _INDEX_ETAG:
+        return Response(status=304)
+    resp = Response(_INDEX_BYTES, mimetype="text/html")
+    resp.headers["ETag"] = _INDEX_ETAG
+    return resp
 
 @app.route("/events")
 def events():
@@ -560,59 +778,110 @@ def events():
 def latest_webp():
     if not os.path.exists(LATEST_WEBP):
         abort(404)
-    return send_file(LATEST_WEBP, mimetype="image/webp", as_attachment=False)
+    # Mutable URL: Last-Modified/ETag let the browser revalidate and get a
+    # 304 until the next capture actually replaces the file
+    resp = send_file(LATEST_WEBP, mimetype="image/webp", conditional=True)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
 @app.route("/img/<path:name>")
 def serve_image(name):
-    safe = os.path.basename(name)
-    target = os.path.join(PHOTOS_DIR, safe)
-    if not os.path.exists(target):
+    base = os.path.basename(name)
+    # latest.webp is mutable — never hand it out immutable-cached
+    if base == "latest.webp":
+        return latest_webp()
+    # Timestamped names never change content: cache hard for a year
+    try:
+        return send_from_directory(PHOTOS_DIR, base,
+                                   mimetype="image/webp", conditional=True,
+                                   max_age=31536000)
+    except Exception:
+        abort(404)
+
+@app.route("/thumb/<path:name>")
+def serve_thumb(name):
+    base = os.path.basename(name)
+    if not base.endswith(".webp"):
         abort(404)
-    return send_file(target, mimetype="image/webp", as_attachment=False)
+    thumb_name = base[:-len(".webp")] + ".thumb.webp"
+    if os.path.exists(os.path.join(PHOTOS_DIR, thumb_name)):
+        return send_from_directory(PHOTOS_DIR, thumb_name,
+                                   mimetype="image/webp", conditional=True,
+                                   max_age=31536000)
+    # Captures from before thumbnails existed: fall back to the full image
+    return serve_image(base)
+
+# Cached gallery list, invalidated by the photo dir's mtime watermark:
+# creating, renaming or deleting a capture bumps the directory mtime, so
+# repeat hits are O(1) instead of a stat per photo
+_gallery_cache = {"mtime": -1.0, "items": []}
 
 @app.route("/gallery.json")
 def gallery():
-    items = []
-    for f in _list_webps_sorted():
-        st = f.stat()
-        items.append({
-            "name": f.name,
-            "url": f"/img/{f.name}",
-            "size": st.st_size,
-            "mtimeMs": int(st.st_mtime * 1000),
-        })
-    return jsonify({"ok": True, "local": items})
+    dir_st = os.stat(PHOTOS_DIR)
+    if dir_st.st_mtime != _gallery_cache["mtime"]:
+        with os.scandir(PHOTOS_DIR) as it:
+            ents = [(e.name, e.stat()) for e in it
+                    if e.is_file() and e.name.endswith(".webp")
+                    and not e.name.endswith(".thumb.webp")
+                    and e.name != "latest.webp"  # has its own hero card
+                    and not e.name.startswith(".")]
+        ents.sort(key=lambda t: t[1].st_mtime)
+        _gallery_cache["items"] = [
+            {"name": name, "url": f"/img/{name}", "thumbUrl": f"/thumb/{name}",
+             "size": st.st_size, "mtimeMs": int(st.st_mtime * 1000)}
+            for name, st in ents
+        ]
+        _gallery_cache["mtime"] = dir_st.st_mtime
+    # These payloads grow with the photo count — serialize via orjson
+    return Response(_json_dumps({"ok": True, "local": _gallery_cache["items"]}),
+                    mimetype="application/json")
+
+def _migrate_arweave_legacy():
+    """One-shot: fold the old arweave.json array into the JSONL sidecar."""
+    if not os.path.exists(ARWEAVE_JSON):
+        return
+    try:
+        with open(ARWEAVE_JSON, "r", encoding="utf-8") as f:
+            legacy = _json_loads(f.read())
+        if isinstance(legacy, list) and legacy:
+            with open(ARWEAVE_JSONL, "a", encoding="utf-8") as f:
+                for rec in legacy:
+                    f.write(_json_dumps(rec) + "\n")
+        os.replace(ARWEAVE_JSON, ARWEAVE_JSON + ".bak")
+        print(f"Migrated {len(legacy) if isinstance(legacy, list) else 0} arweave records to jsonl")
+    except Exception as e:
+        print("Failed to migrate arweave.json:", e)
+
+_migrate_arweave_legacy()
 
 @app.route("/arweave.json")
 def arweave_list():
     try:
-        if not os.path.exists(ARWEAVE_JSON):
-            return jsonify({"ok": True, "items": []})
-        with open(ARWEAVE_JSON, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            if not isinstance(data, list):
-                data = []
-        return jsonify({"ok": True, "items": data})
+        items = []
+        if os.path.exists(ARWEAVE_JSONL):
+            with open(ARWEAVE_JSONL, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        items.append(_json_loads(line))
+                    except Exception:
+                        pass  # skip a torn/corrupt line, keep the rest
+        return Response(_json_dumps({"ok": True, "items": items}),
+                        mimetype="application/json")
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
 def _append_arweave_record(record):
+    # Append-only: O(1) per upload instead of rewriting the whole history
     try:
         os.makedirs(PHOTOS_DIR, exist_ok=True)
-        existing = []
-        if os.path.exists(ARWEAVE_JSON):
-            with open(ARWEAVE_JSON, "r", encoding="utf-8") as f:
-                try:
-                    existing = json.load(f)
-                    if not isinstance(existing, list):
-                        existing = []
-                except Exception:
-                    existing = []
-        existing.append(record)
-        with open(ARWEAVE_JSON, "w", encoding="utf-8") as f:
-            json.dump(existing, f, ensure_ascii=False, indent=2)
+        with open(ARWEAVE_JSONL, "a", encoding="utf-8") as f:
+            f.write(_json_dumps(record) + "\n")
     except Exception as e:
-        print("Failed to persist arweave.json:", e)
+        print("Failed to persist arweave.jsonl:", e)
 
 @app.route("/upload_arweave", methods=["POST"])
 def upload_arweave():
@@ -644,30 +913,65 @@ def upload_arweave_file():
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
-def _perform_arweave_upload_with_file(file_path):
-    """Upload a specific file to Arweave."""
-    if not os.path.exists(file_path):
-        return False, "File not found"
-    
-    # call Node uploader with --json
+# Resident node uploader: one "node upload.js --daemon" process kept alive,
+# speaking one JSON line per request over stdin/stdout. Repeat uploads skip
+# node + Turbo SDK startup (~1-2 s each). Respawned on EOF; the one-shot
+# "--json" spawn remains the fallback.
+_uploader_proc = None
+_uploader_lock = Lock()
+
+def _upload_js_path():
     here = os.path.dirname(os.path.abspath(__file__))
-    upload_js = os.path.join(here, "upload.js")
+    return os.path.join(here, "upload.js")
+
+def _uploader_request(file_path):
+    """Send one upload request to the resident daemon; returns its reply dict."""
+    global _uploader_proc
+    with _uploader_lock:
+        if _uploader_proc is None or _uploader_proc.poll() is not None:
+            _uploader_proc = Popen(["node", _upload_js_path(), "--daemon"],
+                                   stdin=PIPE, stdout=PIPE, text=True, bufsize=1)
+        _uploader_proc.stdin.write(_json_dumps({"file": file_path}) + "\n")
+        _uploader_proc.stdin.flush()
+        line = _uploader_proc.stdout.readline()
+    if not line:
+        raise RuntimeError("uploader daemon closed its pipe")
+    return _json_loads(line)
+
+def _kill_uploader():
+    global _uploader_proc
+    with _uploader_lock:
+        if _uploader_proc is not None:
+            try:
+                _uploader_proc.kill()
+            except Exception:
+                pass
+            _uploader_proc = None
+
+def _upload_via_node(file_path):
+    """Upload one file via node, persist the record, return (ok, record|error)."""
+    upload_js = _upload_js_path()
     if not os.path.exists(upload_js):
         return False, "upload.js not found"
-    
+
     try:
-        proc = run(["node", upload_js, "--json", file_path], check=True, stdout=PIPE, stderr=PIPE)
-        out = proc.stdout.decode("utf-8", errors="ignore").strip()
-        data = json.loads(out)
-    except CalledProcessError as e:
-        err = e.stderr.decode("utf-8", errors="ignore")
-        return False, err or str(e)
-    except Exception as e:
-        return False, str(e)
-    
+        data = _uploader_request(file_path)
+    except Exception as daemon_err:
+        # Daemon died or gave garbage: drop it and do one cold spawn
+        _kill_uploader()
+        try:
+            proc = run(["node", upload_js, "--json", file_path], check=True, stdout=PIPE, stderr=PIPE)
+            out = proc.stdout.decode("utf-8", errors="ignore").strip()
+            data = _json_loads(out)
+        except CalledProcessError as e:
+            err = e.stderr.decode("utf-8", errors="ignore")
+            return False, err or str(daemon_err)
+        except Exception as e:
+            return False, str(e)
+
     if not data.get("ok"):
         return False, data.get("error", "Upload failed")
-    
+
     record = {
         "id": data.get("id"),
         "url": data.get("url"),
@@ -676,15 +980,36 @@ def _perform_arweave_upload_with_file(file_path):
         "tsMs": int(datetime.now().timestamp() * 1000),
     }
     _append_arweave_record(record)
-    
+    return True, record
+
+def _perform_arweave_upload_with_file(file_path):
+    """Upload a specific file to Arweave."""
+    if not os.path.exists(file_path):
+        return False, "File not found"
+
+    ok, payload = _upload_via_node(file_path)
+    if not ok:
+        return False, payload
+
     # Delete local file after successful upload
     try:
         os.remove(file_path)
         print(f"Deleted local file: {os.path.basename(file_path)}")
     except Exception as e:
         print(f"Failed to delete local file {os.path.basename(file_path)}: {e}")
-    
-    return True, record
+
+    # Drop the gallery thumbnail too — it's filtered from listings, so a
+    # leftover would just accumulate invisibly on the SD card
+    if file_path.endswith(".webp"):
+        thumb_path = file_path[:-len(".webp")] + ".thumb.webp"
+        try:
+            os.remove(thumb_path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Failed to delete thumbnail {os.path.basename(thumb_path)}: {e}")
+
+    return True, payload
 
 def _perform_arweave_upload():
     """Uploads latest .webp to Arweave using Node helper, persists record, returns (ok, data|error)."""
@@ -697,34 +1022,7 @@ def _perform_arweave_upload():
     if not src or not os.path.exists(src):
         return False, "No image available to upload"
 
-    # call Node uploader with --json
-    here = os.path.dirname(os.path.abspath(__file__))
-    upload_js = os.path.join(here, "upload.js")
-    if not os.path.exists(upload_js):
-        return False, "upload.js not found"
-
-    try:
-        proc = run(["node", upload_js, "--json", src], check=True, stdout=PIPE, stderr=PIPE)
-        out = proc.stdout.decode("utf-8", errors="ignore").strip()
-        data = json.loads(out)
-    except CalledProcessError as e:
-        err = e.stderr.decode("utf-8", errors="ignore")
-        return False, err or str(e)
-    except Exception as e:
-        return False, str(e)
-
-    if not data.get("ok"):
-        return False, data.get("error", "Upload failed")
-
-    record = {
-        "id": data.get("id"),
-        "url": data.get("url"),
-        "size": data.get("size"),
-        "file": data.get("file"),
-        "tsMs": int(datetime.now().timestamp() * 1000),
-    }
-    _append_arweave_record(record)
-    return True, record
+    return _upload_via_node(src)
 
 @app.route("/capture", methods=["POST"])
 def capture():
@@ -735,7 +1033,12 @@ def capture():
 
 def main():
     Thread(target=button_worker, daemon=True).start()
+    Thread(target=_broadcaster, daemon=True).start()
     print(f"Serving on http://0.0.0.0:{PORT}")
+    # waitress, not uvicorn+WsgiToAsgi: asgiref funnels every WSGI request
+    # through one shared thread (thread_sensitive=True), so a single open
+    # /events SSE stream starves all other requests. A real async tier would
+    # need /events ported to a native ASGI handler first.
     try:
         from waitress import serve as waitress_serve
         waitress_serve(app, host="0.0.0.0", port=PORT)
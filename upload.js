@@ -1,8 +1,17 @@
 #!/usr/bin/env node
 // upload.js — Turbo upload helper for Arweave (CJS) with optional --json output
+//
+// Modes:
+//   node upload.js [--json] [file]   one-shot upload (original behaviour)
+//   node upload.js --daemon          stay resident; read {"file": ...} requests
+//                                    as JSON lines on stdin, answer one JSON
+//                                    line per request on stdout. Wallet and
+//                                    Turbo client are loaded once, so repeat
+//                                    uploads skip ~1-2 s of node/SDK startup.
 
 const fs = require("fs");
 const path = require("path");
+const readline = require("readline");
 
 const ROOT = __dirname;
 const WALLET = path.join(ROOT, "wallet.json");
@@ -32,34 +41,32 @@ function assertFile(p) {
   }
 }
 
-(async () => {
-  const argv = process.argv.slice(2);
-  const IS_JSON = argv.includes("--json");
-  const filtered = argv.filter((a) => a !== "--json");
-
-  const filePath = filtered[0] ? path.resolve(filtered[0]) : DEFAULT_FILE;
-
-  assertFile(WALLET);
-  assertFile(filePath);
+// Authenticated client, created once and reused across uploads
+let _turbo = null;
+async function getTurbo(verbose) {
+  if (_turbo) return _turbo;
+  if (verbose) console.log("[*] Loading wallet…");
+  const jwk = JSON.parse(fs.readFileSync(WALLET, "utf8"));
+  if (verbose) console.log("[*] Authenticating Turbo client…");
+  _turbo = await ensureTurbo(jwk);
+  return _turbo;
+}
 
+async function doUpload(filePath, verbose) {
+  if (!fs.existsSync(filePath)) {
+    return { ok: false, error: `Not found: ${filePath}` };
+  }
   const size = fs.statSync(filePath).size;
   if (size > MAX_BYTES) {
-    const msg = `${path.basename(filePath)} is ${size} bytes (> 100 KB). Please shrink it first.`;
-    if (IS_JSON) {
-      console.log(JSON.stringify({ ok: false, error: msg }));
-    } else {
-      console.error(`[!] ${msg}`);
-    }
-    process.exit(1);
+    return {
+      ok: false,
+      error: `${path.basename(filePath)} is ${size} bytes (> 100 KB). Please shrink it first.`,
+    };
   }
 
-  if (!IS_JSON) console.log("[*] Loading wallet…");
-  const jwk = JSON.parse(fs.readFileSync(WALLET, "utf8"));
+  const turbo = await getTurbo(verbose);
 
-  if (!IS_JSON) console.log("[*] Authenticating Turbo client…");
-  const turbo = await ensureTurbo(jwk);
-
-  if (!IS_JSON) console.log("[*] Uploading:", filePath);
+  if (verbose) console.log("[*] Uploading:", filePath);
   const startedAt = Date.now();
   const result = await turbo.uploadFile({
     fileStreamFactory: () => fs.createReadStream(filePath),
@@ -69,13 +76,13 @@ function assertFile(p) {
     },
     events: {
       onProgress: ({ totalBytes, processedBytes, step }) => {
-        if (!IS_JSON) process.stdout.write(`\r[progress] ${step} ${processedBytes}/${totalBytes} bytes       `);
+        if (verbose) process.stdout.write(`\r[progress] ${step} ${processedBytes}/${totalBytes} bytes       `);
       },
       onError: ({ error, step }) => {
-        if (!IS_JSON) console.error(`\n[error] step=${step}`, error?.message || error);
+        if (verbose) console.error(`\n[error] step=${step}`, error?.message || error);
       },
       onUploadSuccess: () => {
-        if (!IS_JSON) console.log("\n[+] Upload success!");
+        if (verbose) console.log("\n[+] Upload success!");
       },
     },
   });
@@ -109,7 +116,7 @@ function assertFile(p) {
       } else {
         payload.supabase.ok = true;
       }
-    } else if (!IS_JSON) {
+    } else if (verbose) {
       console.log("[supabase] Skipped insert (missing SUPABASE_URL or key)");
     }
   } catch (e) {
@@ -118,12 +125,57 @@ function assertFile(p) {
     payload.supabase.error = msg;
     try { console.error("[supabase] insert failed:", msg); } catch {}
   }
+  return payload;
+}
+
+async function daemonLoop() {
+  assertFile(WALLET);
+  const rl = readline.createInterface({ input: process.stdin, terminal: false });
+  for await (const line of rl) {
+    const trimmed = line.trim();
+    if (!trimmed) continue;
+    let payload;
+    try {
+      const req = JSON.parse(trimmed);
+      const filePath = req.file ? path.resolve(req.file) : DEFAULT_FILE;
+      payload = await doUpload(filePath, false);
+    } catch (e) {
+      payload = { ok: false, error: String(e?.message || e) };
+    }
+    console.log(JSON.stringify(payload));
+  }
+}
+
+(async () => {
+  const argv = process.argv.slice(2);
+  if (argv.includes("--daemon")) {
+    await daemonLoop();
+    return;
+  }
+
+  const IS_JSON = argv.includes("--json");
+  const filtered = argv.filter((a) => a !== "--json");
+
+  const filePath = filtered[0] ? path.resolve(filtered[0]) : DEFAULT_FILE;
+
+  assertFile(WALLET);
+  assertFile(filePath);
+
+  const payload = await doUpload(filePath, !IS_JSON);
+  if (!payload.ok) {
+    if (IS_JSON) {
+      console.log(JSON.stringify(payload));
+    } else {
+      console.error(`[!] ${payload.error}`);
+    }
+    process.exit(1);
+  }
   if (IS_JSON) {
     console.log(JSON.stringify(payload));
   } else {
     console.log("\n---");
-    console.log("Data Item ID:", result.id);
-    console.log("Gateway URL:  https://arweave.net/" + result.id);
+    console.log("Data Item ID:", payload.id);
+    console.log("Gateway URL:  " + payload.url);
   }
 })().catch((e) => {
   const msg = e?.message || e;